@@ -0,0 +1,211 @@
+"""
+==============================================================================
+PROJECT: Signify - Sign Language Translation Avatar
+MODULE:  animation_data.py
+PURPOSE: The "Data Layout" helper.
+         The JSON files store one small dictionary per frame ("Array of Structures"),
+         which is easy to read but slow to process point by point in Python.
+         This module converts a whole animation into one stacked NumPy array per
+         body part ("Structure of Arrays"), so every frame is a ready-made, contiguous slice.
+
+         Layout of the converted animation (a plain dictionary):
+           "f", "p", "l", "r"  -> float32 arrays shaped (num_frames, num_points, 3)
+           "f_mask", ...       -> bool arrays shaped (num_frames,), True if the part was detected
+
+         The same layout is cached next to the JSON file as a compressed ".npz" file
+         (coordinates stored as 16-bit steps of 0.0001), so the Player can skip parsing
+         thousands of floats from text on every run.
+==============================================================================
+"""
+import os
+import numpy as np
+
+# Short keys used in every frame: f (Face), p (Pose), l (Left Hand), r (Right Hand)
+BODY_PART_KEYS = ("f", "p", "l", "r")
+
+# Suffix of the keys that hold the screen pixels of each body part (e.g. "f_px"), added by the Player
+PIXEL_SUFFIX = "_px"
+
+# Coordinates in the ".npz" cache are counted in steps of 0.0001 (the 4 decimals written in the JSON)
+QUANTIZATION_STEPS_PER_UNIT = 10000
+
+# The largest number of steps a 16-bit unsigned integer can hold
+QUANTIZATION_LEVELS = 65535
+
+
+def sequence_to_arrays(animation_sequence: list, dtype=np.float32) -> dict:
+    """
+    Converts the list of frames loaded from JSON into stacked NumPy arrays (one per body part).
+
+    :param animation_sequence: A list of frame dictionaries, e.g. [{'f': [[x, y, z], ...], 'p': ...}, ...]
+    :param dtype: The number type of the coordinates (float32 by default, which is all the Player needs).
+    :return: A dictionary with a (num_frames, num_points, 3) array and a presence mask for every body part.
+    """
+    num_frames = len(animation_sequence)
+    animation_arrays = {}
+
+    for key in BODY_PART_KEYS:
+        # A hand that goes off-screen is saved as an empty list, so we remember
+        # which frames actually contain this body part.
+        presence_mask = np.array(
+            [len(frame_data.get(key, [])) > 0 for frame_data in animation_sequence], dtype=bool
+        )
+
+        # Every detected frame of a body part has the same number of points (e.g. 21 per hand).
+        # Missing frames are filled with zeros and simply ignored thanks to the mask.
+        num_points = max((len(frame_data.get(key, [])) for frame_data in animation_sequence), default=0)
+        stacked_points = np.zeros((num_frames, num_points, 3), dtype=dtype)
+        for frame_index in np.flatnonzero(presence_mask):
+            stacked_points[frame_index] = animation_sequence[frame_index][key]
+
+        animation_arrays[key] = stacked_points
+        animation_arrays[f"{key}_mask"] = presence_mask
+
+    return animation_arrays
+
+
+def arrays_to_sequence(animation_arrays: dict, as_lists: bool = True) -> list:
+    """
+    The opposite of sequence_to_arrays(): rebuilds the JSON-ready list of frames.
+    A body part missing from a frame is written as an empty list, exactly like the original JSON.
+
+    :param animation_arrays: An animation in the stacked layout.
+    :param as_lists: True to convert the points to plain Python lists (needed by the json module).
+                     False keeps them as (N, 3) array views, for encoders that understand NumPy (orjson).
+    :return: A list of frame dictionaries.
+    """
+    def frame_points(key: str, frame_index: int):
+        points = animation_arrays[key][frame_index]
+        return points.tolist() if as_lists else points
+
+    return [
+        {
+            key: frame_points(key, frame_index) if animation_arrays[f"{key}_mask"][frame_index] else []
+            for key in BODY_PART_KEYS
+        }
+        for frame_index in range(count_frames(animation_arrays))
+    ]
+
+
+def count_frames(animation_arrays: dict) -> int:
+    """
+    :param animation_arrays: An animation converted by sequence_to_arrays().
+    :return: The number of frames in the animation.
+    """
+    return len(animation_arrays[f"{BODY_PART_KEYS[0]}_mask"])
+
+
+def get_frame(animation_arrays: dict, frame_index: int, suffix: str = "") -> dict:
+    """
+    Builds the dictionary of a single frame, in the same format the Player and the Drawer expect.
+    No data is copied: every value is a view into the stacked arrays.
+
+    :param animation_arrays: An animation converted by sequence_to_arrays().
+    :param frame_index: The frame number (negative numbers count from the end, like Python lists).
+    :param suffix: "" for the normalized coordinates, PIXEL_SUFFIX for the screen pixels.
+    :return: A dictionary containing an (N, 3) array (or (N, 2) pixels) for each body part detected in this frame.
+    """
+    return {
+        key: animation_arrays[key + suffix][frame_index]
+        for key in BODY_PART_KEYS
+        if animation_arrays[f"{key}_mask"][frame_index]
+    }
+
+
+def get_cache_path(json_path: str) -> str:
+    """
+    :param json_path: The path of an animation JSON file, e.g. "assets/hello.json".
+    :return: The path of its NumPy cache file, e.g. "assets/hello.npz".
+    """
+    return os.path.splitext(json_path)[0] + ".npz"
+
+
+def is_cache_fresh(json_path: str) -> bool:
+    """
+    Checks whether the ".npz" cache exists and is at least as new as the JSON it was built from.
+    (If the JSON was re-generated by the DictionaryBuilder, the old cache must not be used.)
+
+    :param json_path: The path of an animation JSON file.
+    :return: True if the cache can be loaded instead of the JSON.
+    """
+    cache_path = get_cache_path(json_path)
+    if not os.path.exists(cache_path):
+        return False
+    if not os.path.exists(json_path):
+        return True
+    return os.path.getmtime(cache_path) >= os.path.getmtime(json_path)
+
+
+def save_arrays(cache_path: str, animation_arrays: dict) -> None:
+    """
+    Saves a converted animation as a compressed binary ".npz" file (no text parsing when loading it back).
+
+    To keep the file small, every coordinate is stored as a 16-bit integer (uint16, 0..65535)
+    counting steps of exactly 0.0001 - the same 4 decimals the JSON holds - above the smallest
+    value of its axis. The pose can leave the [0, 1] screen range (e.g. legs below the frame),
+    so that minimum is saved too, as a whole number of steps in "<key>_offset":
+        value = (q + offset) / 10000
+    Because both numbers are whole steps, loading gives back exactly the values of the JSON,
+    and the Player draws the same pixels whether a word comes from the JSON or from the cache.
+
+    A body part whose range is too wide for 16 bits (more than 6.5 screens) is stored as plain float32.
+
+    :param cache_path: Where to write the file, e.g. "assets/hello.npz".
+    :param animation_arrays: An animation converted by sequence_to_arrays().
+    """
+    cached_arrays = {}
+    for key in BODY_PART_KEYS:
+        presence_mask = animation_arrays[f"{key}_mask"]
+        cached_arrays[f"{key}_mask"] = presence_mask
+
+        # Position of every coordinate on the 0.0001 grid (float32 input is still close enough to round correctly)
+        grid_points = np.rint(np.asarray(animation_arrays[key], dtype=np.float64) * QUANTIZATION_STEPS_PER_UNIT)
+
+        # Per-axis (x, y, z) minimum, over the frames where the part was detected
+        # (the zeros that fill the missing frames must not stretch the range)
+        detected_points = grid_points[presence_mask]
+        if detected_points.size > 0:
+            axis_offset = detected_points.min(axis=(0, 1))
+            axis_range = detected_points.max(axis=(0, 1)) - axis_offset
+        else:
+            axis_offset = axis_range = np.zeros(3)
+
+        if np.any(axis_range > QUANTIZATION_LEVELS):
+            print(f"[STATUS] '{key}' in {cache_path} is too wide for 16 bits, caching it as float32")
+            cached_arrays[key] = np.asarray(animation_arrays[key], dtype=np.float32)
+            continue
+
+        quantized_points = grid_points - axis_offset
+        quantized_points[~presence_mask] = 0 # Missing frames are ignored anyway
+        cached_arrays[key] = quantized_points.astype(np.uint16)
+        cached_arrays[f"{key}_offset"] = axis_offset.astype(np.int64)
+
+    np.savez_compressed(cache_path, **cached_arrays)
+
+
+def load_arrays(cache_path: str) -> dict:
+    """
+    Loads an animation saved by save_arrays() and converts the 16-bit steps back to float32.
+
+    :param cache_path: The path of the ".npz" file.
+    :return: A dictionary in the same layout returned by sequence_to_arrays().
+    """
+    with np.load(cache_path) as cached_file:
+        cached_arrays = {name: cached_file[name] for name in cached_file.files}
+
+    animation_arrays = {}
+    for key in BODY_PART_KEYS:
+        presence_mask = cached_arrays[f"{key}_mask"]
+        animation_arrays[f"{key}_mask"] = presence_mask
+
+        # Caches written before quantization was added (or too wide for it) hold plain float32 values
+        if f"{key}_offset" not in cached_arrays:
+            animation_arrays[key] = cached_arrays[key].astype(np.float32)
+            continue
+
+        # Divide in float64, where (whole steps / 10000) is the same number the JSON parser produces
+        points = (cached_arrays[key] + cached_arrays[f"{key}_offset"]) / QUANTIZATION_STEPS_PER_UNIT
+        points[~presence_mask] = 0
+        animation_arrays[key] = points.astype(np.float32)
+
+    return animation_arrays
@@ -3,8 +3,8 @@
 PROJECT: Signify - Sign Language Translation Avatar
 MODULE:  avatar_drawer.py
 PURPOSE: The "Renderer" (The Painter).
-         This module is responsible for taking the raw mathematical data (JSON)
-         and drawing it visually on the screen.
+         This module is responsible for taking the raw mathematical data (JSON),
+         converting it to screen pixels, and drawing it visually on the screen.
          
          Current Mode: "Points Only" (Simple Mode).
          It draws dots for every detected joint but does not draw connecting lines.
@@ -14,10 +14,23 @@ PURPOSE: The "Renderer" (The Painter).
 import cv2
 import numpy as np
 
+def merge_boxes(box_a: tuple, box_b: tuple) -> tuple:
+    """
+    :param box_a: A bounding box (x_start, y_start, x_end, y_end).
+    :param box_b: Another bounding box, or None.
+    :return: The smallest bounding box that contains both.
+    """
+    if box_b is None:
+        return box_a
+    return (min(box_a[0], box_b[0]), min(box_a[1], box_b[1]), max(box_a[2], box_b[2]), max(box_a[3], box_b[3]))
+
 class AvatarDrawer:
-    def __init__(self):
+    def __init__(self, canvas_width: int = 1280, canvas_height: int = 720):
         """
         Initializes the drawer and defines the color scheme for the avatar.
+
+        :param canvas_width: Width of the canvas the avatar is drawn on (in pixels).
+        :param canvas_height: Height of the canvas the avatar is drawn on (in pixels).
         """
         # A dictionary mapping the short keys to specific colors.
         # Format: (Blue, Green, Red) - OpenCV uses BGR, not RGB.
@@ -28,17 +41,51 @@ class AvatarDrawer:
             "r": (0, 255, 0)     # Right Hand -> Green
         }
 
-    def draw_frame(self, canvas: np.ndarray, frame_data: dict) -> None:
+        # Pre-computed scaling factor [width, height] for the canvas (HD by default: 1280x720).
+        # Multiplying a whole (N, 2) array by this converts normalized coordinates to pixels.
+        self._scale = np.array([canvas_width, canvas_height], dtype=np.float32)
+
+        # Every joint is drawn as a small filled dot (radius 2 pixels).
+        # Instead of asking OpenCV to draw each dot separately, we "bake" the dot shape once:
+        # cv2.circle draws it into a tiny 5x5 stamp, and we remember the (y, x) offsets of its pixels.
+        # Drawing then writes all dots of a body part with one NumPy operation.
+        self.DOT_RADIUS = 2
+        dot_stamp = np.zeros((2 * self.DOT_RADIUS + 1, 2 * self.DOT_RADIUS + 1), dtype=np.uint8)
+        cv2.circle(dot_stamp, (self.DOT_RADIUS, self.DOT_RADIUS), self.DOT_RADIUS, 1, -1)
+        offsets_y, offsets_x = np.nonzero(dot_stamp)
+        self._dot_offsets_y = offsets_y - self.DOT_RADIUS
+        self._dot_offsets_x = offsets_x - self.DOT_RADIUS
+
+    def to_pixels(self, points: np.ndarray) -> np.ndarray:
+        """
+        Converts normalized coordinates into integer pixel positions on the canvas.
+        The Player calls this once when a word is loaded (and once per blended transition frame),
+        so the drawing itself never has to do any floating-point math.
+
+        :param points: An array of [x, y, z] points shaped (..., 3), normalized (0.0 to 1.0).
+                       Works for a single frame (N, 3) as well as a whole animation (frames, N, 3).
+        :return: An int32 array of [x, y] pixels shaped (..., 2). (z is not needed for 2D)
+        """
+        # x * width = Horizontal Pixel
+        # y * height = Vertical Pixel
+        return (np.asarray(points, dtype=np.float32)[..., :2] * self._scale).astype(np.int32)
+
+    def draw_frame(self, canvas: np.ndarray, frame_pixels: dict) -> tuple:
         """
         Reads a single frame of data and draws it onto the provided canvas.
 
         :param canvas: A numpy array representing the black background image. 
                        Shape is usually (720, 1280, 3).
-        :param frame_data: A dictionary containing the coordinates for this specific frame.
-                           Example: {'p': [[0.5, 0.2, 0.0], ...], 'l': ...}
+        :param frame_pixels: A dictionary containing the pixel positions (see to_pixels) for this specific frame.
+                             Example: {'p': [[640, 144], ...], 'l': ...}
+        :return: The bounding box (x_start, y_start, x_end, y_end) of everything that was drawn
+                 (end values are exclusive, like Python slices), or None if nothing was drawn.
+                 The Player uses it to erase only this area before the next frame.
         """
         # Get the dimensions of the screen (Height, Width, Color Channels)
         canvas_height, canvas_width, _ = canvas.shape
+        
+        drawn_box = None
 
         # Loop through the body parts defined in our colors dictionary
         # key: e.g., "p" for Pose
@@ -47,23 +94,27 @@ class AvatarDrawer:
             
             # Check if this specific body part exists in the current frame's data
             # (Sometimes a hand might go off-screen and not be detected)
-            if key in frame_data:
-                
-                # Retrieve the list of [x, y, z] points for this body part
-                points_list = frame_data[key]
-                
-                # Loop through every single point (joint) in that list
-                for point_coordinates in points_list:
-                    # The coordinates in the JSON are "Normalized" (0.0 to 1.0).
-                    # We must multiply them by the screen size to get actual pixels.
-                    # x * width = Horizontal Pixel
-                    # y * height = Vertical Pixel
-                    x_float = point_coordinates[0]
-                    y_float = point_coordinates[1]
-                    
-                    center_x = int(x_float * canvas_width)
-                    center_y = int(y_float * canvas_height)
-                    
-                    # Draw a filled circle at this location
-                    # radius=2, thickness=-1 (filled)
-                    cv2.circle(canvas, (center_x, center_y), 2, color, -1)
\ No newline at end of file
+            if key not in frame_pixels or len(frame_pixels[key]) == 0:
+                continue
+            
+            # Place the dot stamp on every joint: (N joints) x (pixels per dot) coordinates at once
+            pixel_points = np.asarray(frame_pixels[key])
+            dot_ys = (pixel_points[:, 1, None] + self._dot_offsets_y).ravel()
+            dot_xs = (pixel_points[:, 0, None] + self._dot_offsets_x).ravel()
+            
+            # Drop the dot pixels that fall outside the canvas (e.g. a hand leaving the screen)
+            inside_canvas = (dot_ys >= 0) & (dot_ys < canvas_height) & (dot_xs >= 0) & (dot_xs < canvas_width)
+            
+            dot_ys = dot_ys[inside_canvas]
+            dot_xs = dot_xs[inside_canvas]
+            if dot_ys.size == 0:
+                continue
+            
+            # One vectorized write colors all the dots of this body part
+            canvas[dot_ys, dot_xs] = color
+            
+            # Grow the bounding box to include these dots
+            part_box = (int(dot_xs.min()), int(dot_ys.min()), int(dot_xs.max()) + 1, int(dot_ys.max()) + 1)
+            drawn_box = part_box if drawn_box is None else merge_boxes(drawn_box, part_box)
+        
+        return drawn_box
@@ -7,29 +7,113 @@ PURPOSE: The "Data Factory".
          1. Reads raw MP4 video files.
          2. Uses AI (MediaPipe) to detect the human skeleton.
          3. Optimizes the data (rounding numbers, removing unnecessary face points).
-         4. Saves the result as a lightweight JSON file for the Unity Engine.
+         4. Saves the result as a lightweight JSON file for the Unity Engine,
+            plus a binary ".npz" copy that the Python Player loads without parsing text.
 ==============================================================================
 """
 
 """
 ToDo: We will add a "Motion Threshold Algorithm":
 """
+import collections
 import cv2
+import functools
 import mediapipe as mp
+from mediapipe.framework import calculator_pb2
+from mediapipe.python import resource_util
+from mediapipe.python._framework_bindings import validated_graph_config
+from mediapipe.python.solutions import download_utils
+import numpy as np
 import json
+import multiprocessing
 import os
+import queue
+import threading
+import types
+from animation_data import BODY_PART_KEYS, arrays_to_sequence, get_cache_path, save_arrays, sequence_to_arrays
+
+# Optional: ffmpegcv can decode the video on an NVIDIA GPU (NVDEC) and deliver RGB frames directly.
+# Without it we simply fall back to OpenCV's CPU decoder.
+try:
+    import ffmpegcv
+except ImportError:
+    ffmpegcv = None
+
+# Optional: orjson writes the JSON straight from the NumPy arrays (much faster than the json module).
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# MediaPipe's Holistic graph: the same calculator graph that mp.solutions.holistic.Holistic runs,
+# but we drive it ourselves so several frames can be inside the graph at the same time.
+HOLISTIC_GRAPH_PATH = "mediapipe/modules/holistic_landmark/holistic_landmark_cpu.binarypb"
+
+# The Lite and Heavy pose models are not shipped inside the MediaPipe package; they are downloaded on first use.
+POSE_MODEL_DOWNLOADS = {
+    0: "mediapipe/modules/pose_landmark/pose_landmark_lite.tflite",
+    2: "mediapipe/modules/pose_landmark/pose_landmark_heavy.tflite"
+}
+
+# The pose model used when no model_complexity is given (0 = Lite, see DictionaryBuilder)
+DEFAULT_MODEL_COMPLEXITY = 0
+
+# The graph outputs we record (the names of its output streams)
+HOLISTIC_OUTPUT_STREAMS = ["face_landmarks", "pose_landmarks", "left_hand_landmarks", "right_hand_landmarks"]
+
+# Timestamps (in microseconds) given to the frames, as if the video was 30 FPS.
+# MediaPipe's landmark smoothing uses them to measure the time between two frames.
+# Like Holistic, the first frame gets FRAME_TIMESTAMP_STEP and not 0 (which changes the smoothed pose).
+FRAME_TIMESTAMP_STEP = 33333
+
+def drain_queue(work_queue: queue.Queue) -> None:
+    """
+    Reads and throws away items until the end marker (None) arrives.
+    Used when a pipeline stage stops early, so the stage feeding it can still finish.
+
+    :param work_queue: A queue between two pipeline stages.
+    """
+    while work_queue.get() is not None:
+        pass
 
 class DictionaryBuilder:
-    def __init__(self):
+    def __init__(self, model_complexity: int = DEFAULT_MODEL_COMPLEXITY, pipeline_depth: int = 4, use_opencl: bool = False):
         """
         Initializes the AI model and defines optimization settings.
+
+        :param model_complexity: MediaPipe pose model size: 0 (Lite, fastest), 1 (Full) or 2 (Heavy, most accurate).
+                                 We only record landmarks, so the Lite model is usually enough.
+        :param pipeline_depth: How many frames may be inside the AI graph at the same time (1 = one by one,
+                               like Holistic.process()). The graph works on different frames in different
+                               calculators at the same time, so a depth of ~4 keeps a multi-core CPU busy.
+        :param use_opencl: True to run the BGR->RGB conversion on the GPU through OpenCL (OpenCV's "T-API"),
+                           if this computer supports it. Copying every frame to the GPU and back also costs time,
+                           so this only pays off with a fast (e.g. integrated) GPU - measure before enabling it.
         """
-        # Initialize MediaPipe Holistic (The AI that detects Face, Body, and Hands)
-        self.mp_holistic = mp.solutions.holistic
-        self.ai_model = self.mp_holistic.Holistic(
-            min_detection_confidence=0.5, 
-            model_complexity=1
-        )
+        # Settings of MediaPipe Holistic (The AI that detects Face, Body, and Hands)
+        # - use_prev_landmarks / smooth_landmarks (static_image_mode=False): the frames come from a video,
+        #   so MediaPipe tracks the landmarks from the previous frame and runs the (slow)
+        #   palm/pose detectors only when tracking is lost.
+        # - refine_face_landmarks=False: skips the extra attention-mesh pass for lips and irises.
+        #   FACE_INDICES_TO_KEEP only uses the basic 468-point mesh, so that work would be wasted.
+        # - The graph's built-in detection and tracking confidences are both 0.5, the values we always used.
+        self.holistic_side_packets = {
+            "model_complexity": mp.packet_creator.create_int(model_complexity),
+            "smooth_landmarks": mp.packet_creator.create_bool(True),
+            "use_prev_landmarks": mp.packet_creator.create_bool(True),
+            "refine_face_landmarks": mp.packet_creator.create_bool(False),
+            "enable_segmentation": mp.packet_creator.create_bool(False),
+            "smooth_segmentation": mp.packet_creator.create_bool(False)
+        }
+        self.PIPELINE_DEPTH = pipeline_depth
+        self.USE_OPENCL = use_opencl and cv2.ocl.haveOpenCL()
+        
+        # The graph finds its model files relative to the folder that contains the "mediapipe" package
+        mediapipe_root = os.path.dirname(os.path.dirname(os.path.abspath(mp.__file__)))
+        resource_util.set_resource_dir(mediapipe_root)
+        self.holistic_graph_path = os.path.join(mediapipe_root, HOLISTIC_GRAPH_PATH)
+        if model_complexity in POSE_MODEL_DOWNLOADS:
+            download_utils.download_oss_model(POSE_MODEL_DOWNLOADS[model_complexity])
         
         # === OPTIMIZATION SETTING ===
         # MediaPipe detects 468 face points. We only need the eyes, eyebrows, and mouth
@@ -41,90 +125,499 @@ class DictionaryBuilder:
             70, 63, 105, 66, 107, 336, 296, 334, 293, 300, # Eyebrows
             33, 133, 362, 263 # Eyes
         ]
+        
+        # The same "Keep List" as a True/False mask over all 468 face points,
+        # so filtering a face is a single NumPy operation instead of 468 list lookups.
+        self._face_keep_mask = np.zeros(468, dtype=bool)
+        self._face_keep_mask[self.FACE_INDICES_TO_KEEP] = True
+        
+        # === PIPELINE SETTING ===
+        # How many frames may wait between two stages of the pipeline (see process_video_to_json).
+        self.PIPELINE_QUEUE_SIZE = 8
+        
+        # === AI GRAPH ===
+        # One graph for the whole life of the builder (like the Holistic object it replaces).
+        # It is restarted before every video (see reset_graph), so no tracking carries over between words.
+        # The graph delivers its outputs from its own threads (see store_graph_output):
+        # - graph_outputs: the landmarks of the frames still inside the pipeline, by timestamp
+        # - settled_timestamps: per output stream, the newest timestamp it has answered for
+        #   (with a packet, or with an empty "nothing detected up to here" packet)
+        self.graph_outputs = {}
+        self.settled_timestamps = dict.fromkeys(HOLISTIC_OUTPUT_STREAMS, -1)
+        self.graph_condition = threading.Condition()
+        self.next_timestamp = FRAME_TIMESTAMP_STEP
+        
+        # The graph is loaded the way Holistic loads it: validated first, which expands its subgraphs
+        # into their final form. (Loading the .binarypb file directly gives slightly different landmarks.)
+        validated_graph = validated_graph_config.ValidatedGraphConfig()
+        validated_graph.initialize(binary_graph_path=self.holistic_graph_path)
+        self.holistic_graph_config = calculator_pb2.CalculatorGraphConfig()
+        self.holistic_graph_config.ParseFromString(validated_graph.binary_config)
+        
+        self.holistic_graph = self.start_graph()
+
+    def start_graph(self):
+        """
+        Creates the AI graph from the loaded config, connects its outputs to store_graph_output and starts it.
+
+        :return: The running mp.CalculatorGraph.
+        """
+        holistic_graph = mp.CalculatorGraph(graph_config=self.holistic_graph_config)
+        for stream_name in HOLISTIC_OUTPUT_STREAMS:
+            # observe_timestamp_bounds=True: a body part that was not detected still reports the frame as done
+            holistic_graph.observe_output_stream(
+                stream_name, self.store_graph_output, observe_timestamp_bounds=True
+            )
+        holistic_graph.start_run(self.holistic_side_packets)
+        return holistic_graph
+
+    def close(self) -> None:
+        """
+        Stops the AI graph and frees its models. The builder cannot process videos afterwards.
+        """
+        self.holistic_graph.close()
+
+    def reset_graph(self) -> None:
+        """
+        Replaces the AI graph with a fresh one, so tracking and landmark smoothing start over
+        and every word's landmarks depend only on its own video.
+        Closing waits for the frames still inside the old graph, so none of their outputs can arrive later.
+
+        (Holistic's reset() restarts the same graph instead, but a restarted graph stops reporting
+        the timestamp bounds of undetected body parts below the last run's final timestamp.)
+        """
+        self.holistic_graph.close()
+        with self.graph_condition:
+            self.graph_outputs.clear()
+            self.settled_timestamps = dict.fromkeys(HOLISTIC_OUTPUT_STREAMS, -1)
+        self.next_timestamp = FRAME_TIMESTAMP_STEP
+        self.holistic_graph = self.start_graph()
 
-    def convert_landmarks_to_list(self, landmarks_object, apply_face_filter: bool = False) -> list:
+    def convert_landmarks_to_array(self, landmarks_object, apply_face_filter: bool = False) -> np.ndarray:
         """
-        Converts the complex MediaPipe result object into a simple Python list.
+        Converts the complex MediaPipe result object into a simple NumPy array.
 
         :param landmarks_object: The raw detection result from MediaPipe (contains .x, .y, .z).
         :param apply_face_filter: Boolean (True/False). If True, we discard most face points to save space.
-        :return: A list of lists containing coordinates, e.g., [[0.5, 0.2, -0.1], ...]
+        :return: An (N, 3) array containing the raw coordinates, e.g., [[0.512345, 0.2, -0.1], ...]
+                 (rounded once for the whole video in process_video_to_json).
         """
         if not landmarks_object: 
-            return []
+            return np.empty((0, 3), dtype=np.float64)
         
-        optimized_points = []
+        # Copy all detected points (landmarks) into one array in a single pass
+        optimized_points = np.array(
+            [(landmark.x, landmark.y, landmark.z) for landmark in landmarks_object.landmark],
+            dtype=np.float64
+        )
         
-        # Loop through every detected point (landmark)
-        for index, landmark in enumerate(landmarks_object.landmark):
-            
-            # If this is a face, and the current index is NOT in our "Keep List", skip it.
-            if apply_face_filter and index not in self.FACE_INDICES_TO_KEEP: 
-                continue
-            
-            # Rounding to 4 decimal places (e.g., 0.123456 -> 0.1235)
-            # This reduces the file size by ~40% without losing visible quality.
-            x = round(landmark.x, 4)
-            y = round(landmark.y, 4)
-            z = round(landmark.z, 4)
-            
-            optimized_points.append([x, y, z])
+        # If this is a face, keep only the points of our "Keep List" (one boolean-mask lookup)
+        if apply_face_filter:
+            optimized_points = optimized_points[:self._face_keep_mask.size][self._face_keep_mask]
             
         return optimized_points
 
-    def process_video_to_json(self, word_name: str) -> None:
+    def open_video(self, video_path: str) -> tuple:
         """
-        The main function. Opens the video, runs the AI, and saves the JSON.
+        Opens the video with the fastest decoder available on this computer.
+        Order: ffmpegcv on the GPU (NVDEC) -> ffmpegcv on the CPU -> OpenCV.
 
-        :param word_name: The name of the word to process (e.g., "hello"). 
-                          The script expects "assets/hello.mp4" to exist.
+        :param video_path: The path of the MP4 file.
+        :return: A tuple (video_capture, frames_are_rgb). ffmpegcv already delivers RGB frames,
+                 OpenCV delivers BGR frames that still need to be converted for MediaPipe.
         """
-        video_path = f"assets/{word_name}.mp4"
-        json_output_path = f"assets/{word_name}.json"
+        if ffmpegcv is not None and os.path.exists(video_path):
+            try:
+                return ffmpegcv.VideoCaptureNV(video_path, pix_fmt='rgb24'), True
+            except Exception:
+                pass # No NVIDIA GPU / driver: try the CPU version of ffmpegcv instead
+            try:
+                return ffmpegcv.VideoCapture(video_path, pix_fmt='rgb24'), True
+            except Exception:
+                pass # ffmpeg itself is missing: use OpenCV
         
-        # Open the video file
         video_capture = cv2.VideoCapture(video_path)
         
-        # This list will store the data for every single frame of the video
-        full_animation_data = []
+        # Keep the decoder's internal buffer minimal, we read the frames as fast as we can anyway
+        video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return video_capture, False
 
-        print(f"[STATUS] Processing video: {word_name}...")
+    def read_video_frames(self, video_capture, frames_are_rgb: bool, frame_queue: queue.Queue,
+                          frame_stride: int, stop_event: threading.Event, pipeline_errors: list) -> None:
+        """
+        Pipeline stage 1 (runs in its own thread): decodes the video and converts every kept frame to RGB.
 
-        while video_capture.isOpened():
-            success, frame_image = video_capture.read()
+        :param video_capture: A capture returned by open_video().
+        :param frames_are_rgb: True if the capture already delivers RGB frames (ffmpegcv).
+        :param frame_queue: The queue that receives the RGB images. None is always sent at the end,
+                            even after an error, so the next stage never waits forever.
+        :param frame_stride: Keep only every N-th frame (1 = keep all frames).
+        :param stop_event: Set when another stage failed: stop reading early.
+        :param pipeline_errors: Receives the exception if this stage fails (re-raised by process_video_to_json).
+        """
+        try:
+            self.decode_frames(video_capture, frames_are_rgb, frame_queue, frame_stride, stop_event)
+        except BaseException as error:
+            pipeline_errors.append(error)
+            stop_event.set()
+        finally:
+            # Tell the next stage that there are no more frames
+            frame_queue.put(None)
+
+    def decode_frames(self, video_capture, frames_are_rgb: bool, frame_queue: queue.Queue,
+                      frame_stride: int, stop_event: threading.Event) -> None:
+        """
+        The work of pipeline stage 1 (see read_video_frames for the parameters).
+        """
+        frame_index = 0
+        while video_capture.isOpened() and not stop_event.is_set():
+            if frames_are_rgb:
+                # ffmpegcv has no grab(): every frame arrives already decoded (and converted) by ffmpeg
+                success, frame_image = video_capture.read()
+            else:
+                # grab() only advances to the next frame; the expensive decoding to a BGR image
+                # happens in retrieve(), so frames we skip cost almost nothing.
+                success = video_capture.grab()
             if not success: 
                 break # Stop if the video ends
             
-            # MediaPipe requires RGB color format (OpenCV uses BGR by default)
-            image_rgb = cv2.cvtColor(frame_image, cv2.COLOR_BGR2RGB)
+            # Frame gate: today a simple stride, later the place for the "Motion Threshold Algorithm"
+            keep_frame = frame_index % frame_stride == 0
+            frame_index += 1
+            if not keep_frame:
+                continue
+            
+            if frames_are_rgb:
+                image_rgb = frame_image
+            else:
+                success, frame_image = video_capture.retrieve()
+                if not success:
+                    break
+                
+                # MediaPipe requires RGB color format (OpenCV uses BGR by default)
+                if self.USE_OPENCL:
+                    # cv2.UMat uploads the frame to the GPU, .get() downloads the converted image again
+                    image_rgb = cv2.cvtColor(cv2.UMat(frame_image), cv2.COLOR_BGR2RGB).get()
+                else:
+                    image_rgb = cv2.cvtColor(frame_image, cv2.COLOR_BGR2RGB)
+            frame_queue.put(image_rgb)
+
+    def collect_frame_data(self, results_queue: queue.Queue, full_animation_data: list,
+                           stop_event: threading.Event, pipeline_errors: list) -> None:
+        """
+        Pipeline stage 3 (runs in its own thread): turns the AI results into our small frame dictionaries.
+
+        :param results_queue: The queue of MediaPipe results. None marks the end of the video.
+        :param full_animation_data: The list that receives one dictionary per frame (in video order).
+        :param stop_event: Set by this stage if it fails, so the other stages stop early.
+        :param pipeline_errors: Receives the exception if this stage fails (re-raised by process_video_to_json).
+        """
+        try:
+            self.convert_results(results_queue, full_animation_data)
+        except BaseException as error:
+            pipeline_errors.append(error)
+            stop_event.set()
             
-            # Run the AI detection
-            ai_results = self.ai_model.process(image_rgb)
+            # Keep emptying the queue until the end marker, so stage 2 is never stuck on a full queue
+            drain_queue(results_queue)
+
+    def convert_results(self, results_queue: queue.Queue, full_animation_data: list) -> None:
+        """
+        The work of pipeline stage 3 (see collect_frame_data for the parameters).
+        """
+        while True:
+            ai_results = results_queue.get()
+            if ai_results is None:
+                break
             
             # Extract and organize the data for this specific frame
             # keys: 'f' (face), 'p' (pose), 'l' (left hand), 'r' (right hand)
             # We use short keys to keep the JSON file size small.
             current_frame_data = {
-                "f": self.convert_landmarks_to_list(ai_results.face_landmarks, apply_face_filter=True),
-                "p": self.convert_landmarks_to_list(ai_results.pose_landmarks),
-                "l": self.convert_landmarks_to_list(ai_results.left_hand_landmarks),
-                "r": self.convert_landmarks_to_list(ai_results.right_hand_landmarks)
+                "f": self.convert_landmarks_to_array(ai_results.face_landmarks, apply_face_filter=True),
+                "p": self.convert_landmarks_to_array(ai_results.pose_landmarks),
+                "l": self.convert_landmarks_to_array(ai_results.left_hand_landmarks),
+                "r": self.convert_landmarks_to_array(ai_results.right_hand_landmarks)
             }
             
             full_animation_data.append(current_frame_data)
+
+    def store_graph_output(self, stream_name: str, packet) -> None:
+        """
+        Called by the graph's own threads for every packet of an observed output stream.
+        Records the landmarks and wakes up run_holistic_graph, which may be waiting for this frame.
+
+        :param stream_name: The output stream (one of HOLISTIC_OUTPUT_STREAMS).
+        :param packet: The landmarks of one frame, or an empty packet if nothing was detected so far.
+        """
+        with self.graph_condition:
+            if not packet.is_empty():
+                landmarks = mp.packet_getter.get_proto(packet)
+                self.graph_outputs.setdefault(packet.timestamp.value, {})[stream_name] = landmarks
+            
+            # Each stream answers in timestamp order, so everything up to this timestamp is final
+            self.settled_timestamps[stream_name] = max(self.settled_timestamps[stream_name], packet.timestamp.value)
+            self.graph_condition.notify_all()
+
+    def forward_finished_frames(self, pending_timestamps: collections.deque, results_queue: queue.Queue,
+                                max_pending: int) -> None:
+        """
+        Passes the oldest frames on to stage 3 (in video order) as soon as all their outputs arrived.
+        Waits only while more than max_pending frames are still inside the graph.
+
+        :param pending_timestamps: The timestamps sent into the graph and not passed on yet (oldest first).
+        :param results_queue: The queue that receives the results, with the same fields as
+                              Holistic.process() results (e.g. .face_landmarks).
+        :param max_pending: How many unfinished frames may stay in the graph (0 = wait for all of them).
+        """
+        if max_pending == 0:
+            # A stream may report "nothing up to here" only when the next frame arrives, so the last
+            # frames never settle on their own. Wait for the whole graph instead (like Holistic.process()):
+            # once it is idle, every output has arrived and a missing one means "not detected".
+            self.holistic_graph.wait_until_idle()
+        
+        while pending_timestamps:
+            oldest_timestamp = pending_timestamps[0]
+            with self.graph_condition:
+                while max_pending > 0 and min(self.settled_timestamps.values()) < oldest_timestamp:
+                    if len(pending_timestamps) <= max_pending:
+                        return # Not done yet, but there is room for another frame: send it first
+                    
+                    # A failed graph never answers, so check for errors instead of waiting forever
+                    if not self.graph_condition.wait(timeout=1.0) and self.holistic_graph.has_error():
+                        raise RuntimeError(self.holistic_graph.get_combined_error_message())
+                frame_outputs = self.graph_outputs.pop(oldest_timestamp, {})
+            
+            pending_timestamps.popleft()
+            results_queue.put(types.SimpleNamespace(
+                **{stream_name: frame_outputs.get(stream_name) for stream_name in HOLISTIC_OUTPUT_STREAMS}
+            ))
+
+    def run_holistic_graph(self, frame_queue: queue.Queue, results_queue: queue.Queue, stop_event: threading.Event) -> None:
+        """
+        Pipeline stage 2: runs the MediaPipe Holistic graph on the frames of one video.
+
+        Holistic.process() sends one frame and waits until the graph is completely idle, so most of
+        the graph's calculators (and CPU cores) sit waiting. Here up to PIPELINE_DEPTH frames are inside
+        the graph at once, and every frame is passed on the moment it is finished (a sliding window),
+        so the graph never has to run empty between frames.
+        The graph is restarted first if it has already seen frames, so every video starts without tracking history.
+
+        :param frame_queue: The queue of RGB images. None marks the end of the video.
+        :param results_queue: The queue that receives the results of every frame (in video order).
+        :param stop_event: Set when another stage failed: stop early.
+        """
+        if self.next_timestamp != FRAME_TIMESTAMP_STEP:
+            self.reset_graph()
+        
+        pending_timestamps = collections.deque()
+        reached_end_of_video = False
+        try:
+            while not stop_event.is_set():
+                image_rgb = frame_queue.get()
+                if image_rgb is None:
+                    reached_end_of_video = True
+                    break # Stop if the video ends
+                
+                # Send the frame into the graph without waiting for its result
+                image_packet = mp.packet_creator.create_image_frame(data=image_rgb, image_format=mp.ImageFormat.SRGB)
+                self.holistic_graph.add_packet_to_input_stream(
+                    stream="image", packet=image_packet.at(self.next_timestamp)
+                )
+                pending_timestamps.append(self.next_timestamp)
+                self.next_timestamp += FRAME_TIMESTAMP_STEP
+                
+                # Pass on what is finished; wait only if the pipeline is full
+                self.forward_finished_frames(pending_timestamps, results_queue, max(self.PIPELINE_DEPTH - 1, 0))
+            
+            if reached_end_of_video:
+                self.forward_finished_frames(pending_timestamps, results_queue, 0)
+        finally:
+            # Stopped early (error or stop_event): let the reader deliver its end marker, so it can finish
+            if not reached_end_of_video:
+                drain_queue(frame_queue)
+
+    def process_video_to_json(self, word_name: str, frame_stride: int = 1) -> None:
+        """
+        The main function. Opens the video, runs the AI, and saves the JSON.
+
+        The work is split into a 3-stage pipeline, so decoding the next frame and converting
+        the previous results happen while the AI is busy with the current frame:
+          [Reader thread: decode + to RGB] -> [This thread: MediaPipe graph] -> [Collector thread: to arrays]
+
+        :param word_name: The name of the word to process (e.g., "hello"). 
+                          The script expects "assets/hello.mp4" to exist.
+        :param frame_stride: Process only every N-th frame (e.g., 2 turns a 60 FPS video into 30 FPS data).
+        """
+        video_path = f"assets/{word_name}.mp4"
+        json_output_path = f"assets/{word_name}.json"
+        
+        # Open the video file (on the GPU if possible)
+        video_capture, frames_are_rgb = self.open_video(video_path)
         
-        video_capture.release()
+        # This list will store the data for every single frame of the video
+        full_animation_data = []
+
+        # Small bounded queues: a fast stage waits for a slow one instead of filling the RAM with frames
+        frame_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        results_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+
+        # If any stage fails, it stores its exception here and sets stop_event, so the other stages stop early.
+        # Every stage always sends its end marker (None) and every stage reads until it gets one,
+        # so no thread is ever left waiting on a queue.
+        pipeline_errors = []
+        stop_event = threading.Event()
+
+        reader_thread = threading.Thread(
+            target=self.read_video_frames,
+            args=(video_capture, frames_are_rgb, frame_queue, frame_stride, stop_event, pipeline_errors), daemon=True
+        )
+        collector_thread = threading.Thread(
+            target=self.collect_frame_data,
+            args=(results_queue, full_animation_data, stop_event, pipeline_errors), daemon=True
+        )
+
+        print(f"[STATUS] Processing video: {word_name}...")
+
+        reader_thread.start()
+        collector_thread.start()
+        try:
+            self.run_holistic_graph(frame_queue, results_queue, stop_event)
+        except BaseException as error:
+            pipeline_errors.append(error)
+            stop_event.set()
+        finally:
+            # Always stop the collector, even if the AI raised an error
+            results_queue.put(None)
+            collector_thread.join()
+            reader_thread.join()
+            video_capture.release()
+        
+        # Report the first failure of any stage to the caller (nothing is saved in that case)
+        if pipeline_errors:
+            raise pipeline_errors[0]
+        
+        # Stack all frames into one array per body part (float64 keeps the rounded decimals exact,
+        # so the JSON text stays short, e.g. "0.1235" and not "0.12349999696")
+        animation_arrays = sequence_to_arrays(full_animation_data, dtype=np.float64)
+        
+        # Rounding to 4 decimal places (e.g., 0.123456 -> 0.1235)
+        # This reduces the file size by ~40% without losing visible quality.
+        # One NumPy call rounds the whole video of a body part at once.
+        for key in BODY_PART_KEYS:
+            np.round(animation_arrays[key], 4, out=animation_arrays[key])
         
         # Save the list to a JSON file
-        # 'separators' removes spaces to make the file as small as possible
-        with open(json_output_path, 'w') as json_file:
-            json.dump(full_animation_data, json_file, separators=(',', ':'))
+        if orjson is not None:
+            # orjson reads the float64 arrays directly (no .tolist()) and also writes no spaces
+            with open(json_output_path, 'wb') as json_file:
+                json_file.write(orjson.dumps(
+                    arrays_to_sequence(animation_arrays, as_lists=False), option=orjson.OPT_SERIALIZE_NUMPY
+                ))
+        else:
+            # 'separators' removes spaces to make the file as small as possible
+            with open(json_output_path, 'w') as json_file:
+                json.dump(arrays_to_sequence(animation_arrays), json_file, separators=(',', ':'))
+        
+        # Save the same data as a compressed 16-bit cache (written after the JSON, so the cache is never older)
+        cache_output_path = get_cache_path(json_output_path)
+        save_arrays(cache_output_path, animation_arrays)
             
-        print(f"[SUCCESS] Data saved to: {json_output_path}")
+        print(f"[SUCCESS] Data saved to: {json_output_path} and {cache_output_path}")
+
+# The DictionaryBuilder settings of this worker process (set by init_worker)
+_worker_settings = {}
+
+# The builder of this worker process, created by its first word and reused for all the others.
+# Its graph is restarted before every video (see DictionaryBuilder.reset_graph), so a word's landmarks
+# never depend on which words the pool happened to give this worker before it.
+_worker_builder = None
+
+def init_worker(builder_settings: dict) -> None:
+    """
+    Runs once in every new worker process and remembers the settings for its DictionaryBuilder.
+
+    :param builder_settings: The keyword arguments of DictionaryBuilder (e.g., {"model_complexity": 1}).
+    """
+    global _worker_settings
+    _worker_settings = builder_settings
+
+def process_one_word(word_name: str, frame_stride: int = 1) -> str:
+    """
+    Converts a single word in a worker process. Every process has its own DictionaryBuilder,
+    so each one has a private MediaPipe graph.
+
+    :param word_name: The name of the word to process (e.g., "hello").
+    :param frame_stride: Process only every N-th frame (see process_video_to_json).
+    :return: The same word name (handy to report progress).
+    """
+    global _worker_builder
+    if _worker_builder is None:
+        _worker_builder = DictionaryBuilder(**_worker_settings)
+    try:
+        _worker_builder.process_video_to_json(word_name, frame_stride)
+    except BaseException:
+        # The graph may be broken now: start a fresh builder for the next word of this worker
+        failed_builder, _worker_builder = _worker_builder, None
+        try:
+            failed_builder.close()
+        except RuntimeError:
+            pass # A failed graph reports its error again when closed; the original error is raised below
+        raise
+    return word_name
+
+def build_dictionary(word_names: list, processes: int = None, model_complexity: int = DEFAULT_MODEL_COMPLEXITY,
+                     pipeline_depth: int = 4, use_opencl: bool = False, frame_stride: int = 1) -> None:
+    """
+    Converts many words in parallel, one video per process.
+    (Processes, not threads: MediaPipe only partly releases Python's GIL.)
+
+    :param word_names: The names of the words to process (e.g., ["hello", "sea"]).
+    :param processes: How many videos to convert at once. By default one per physical core
+                      (about half of os.cpu_count()), because each MediaPipe graph is itself multi-threaded.
+    :param model_complexity: Passed to every DictionaryBuilder (see DictionaryBuilder.__init__).
+    :param pipeline_depth: Passed to every DictionaryBuilder.
+    :param use_opencl: Passed to every DictionaryBuilder.
+    :param frame_stride: Process only every N-th frame of every video (see process_video_to_json).
+    """
+    if not word_names:
+        return # Nothing to do: do not load (or download) any model
+    
+    builder_settings = {
+        "model_complexity": model_complexity,
+        "pipeline_depth": pipeline_depth,
+        "use_opencl": use_opencl
+    }
+    
+    if processes is None:
+        processes = max(1, (os.cpu_count() or 2) // 2)
+    processes = min(processes, len(word_names))
+    
+    # A single worker would only add the cost of starting a process
+    if processes <= 1:
+        builder = DictionaryBuilder(**builder_settings)
+        try:
+            for word_name in word_names:
+                builder.process_video_to_json(word_name, frame_stride)
+        finally:
+            builder.close()
+        return
+    
+    # Download the pose model (if it is missing) once here, so the workers
+    # do not all download the same file at the same time.
+    if model_complexity in POSE_MODEL_DOWNLOADS:
+        download_utils.download_oss_model(POSE_MODEL_DOWNLOADS[model_complexity])
+    
+    # "spawn" starts every worker as a fresh Python process instead of a copy ("fork") of this one,
+    # which is not safe once native libraries like MediaPipe or OpenCV have started their threads.
+    spawn_context = multiprocessing.get_context("spawn")
+    with spawn_context.Pool(processes=processes, initializer=init_worker, initargs=(builder_settings,)) as pool:
+        convert_word = functools.partial(process_one_word, frame_stride=frame_stride)
+        for word_name in pool.imap_unordered(convert_word, word_names):
+            print(f"[STATUS] Finished word: {word_name}")
 
 if __name__ == "__main__":
     # Example usage:
-    tool = DictionaryBuilder()
-    
-    # Replace "hello" with the name of the MP4 file you want to convert
-    tool.process_video_to_json("sea")
\ No newline at end of file
+    # Replace "sea" with the names of the MP4 files you want to convert.
+    # Several words are converted in parallel (one process per CPU core).
+    build_dictionary(["sea"])
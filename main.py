@@ -4,7 +4,7 @@ PROJECT: Signify - Sign Language Translation Avatar
 MODULE:  main.py
 PURPOSE: The Application Controller (The Player).
          This script manages the runtime execution:
-         1. Loads the lightweight JSON data.
+         1. Loads the lightweight JSON data (or its binary ".npz" cache).
          2. Smooths transitions between frames using Linear Interpolation (Lerp).
          3. Sends data to the AvatarDrawer for rendering.
          4. Handles user input (Quit).
@@ -13,20 +13,86 @@ PURPOSE: The Application Controller (The Player).
 import cv2
 import json
 import os
+import queue
+import threading
+import time
 import numpy as np
-from avatar_drawer import AvatarDrawer
+from avatar_drawer import AvatarDrawer, merge_boxes
+from animation_data import (
+    BODY_PART_KEYS, PIXEL_SUFFIX, count_frames, get_cache_path, get_frame, is_cache_fresh,
+    load_arrays, save_arrays, sequence_to_arrays
+)
+
+# Optional: Numba compiles the Lerp loop below into native machine code.
+# Without it, the same math is done with NumPy (also fast, just a few temporary arrays more).
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # cache=True stores the compiled code on disk, so only the very first run pays the compile time
+    @njit(cache=True, fastmath=True)
+    def _lerp_kernel(points_a, points_b, interpolation_factors, out):
+        for step in range(interpolation_factors.shape[0]):
+            factor = interpolation_factors[step]
+            for point_index in range(points_a.shape[0]):
+                for axis in range(3):
+                    start = points_a[point_index, axis]
+                    out[step, point_index, axis] = start + (points_b[point_index, axis] - start) * factor
+
+
+def lerp_points(points_a: np.ndarray, points_b: np.ndarray, interpolation_factors: np.ndarray) -> np.ndarray:
+    """
+    The Lerp formula for a whole body part and several steps at once: Result = A + (B - A) * Factor
+
+    :param points_a: The (N, 3) float32 points of the starting pose.
+    :param points_b: The (N, 3) float32 points of the target pose.
+    :param interpolation_factors: A 1D float32 array of factors between 0.0 and 1.0.
+    :return: A (num_factors, N, 3) float32 array, one blended pose per factor.
+             If A and B have a different number of points, only the first N = shorter length are blended
+             (like pairing them with zip() point by point).
+    """
+    # Never let the kernel read past the end of the shorter body part
+    if points_a.shape != points_b.shape:
+        num_points = min(len(points_a), len(points_b))
+        points_a = points_a[:num_points]
+        points_b = points_b[:num_points]
+    
+    # The result is allocated once and filled in place
+    out = np.empty((len(interpolation_factors),) + points_a.shape, dtype=np.float32)
+    if njit is not None:
+        _lerp_kernel(points_a, points_b, interpolation_factors, out)
+    else:
+        np.multiply(points_b - points_a, interpolation_factors[:, None, None], out=out)
+        out += points_a
+    return out
+
+
+# Words that were already loaded, so a repeated word (or a replayed sentence) is not read from disk again.
+# Key: (file path, canvas width, canvas height), because the stored pixels depend on the canvas size.
+# The oldest entry is dropped once the cache holds _CACHE_MAX_WORDS words, to cap the memory use.
+_cache: dict = {}
+_CACHE_MAX_WORDS = 64
 
 class SignLanguagePlayer:
     def __init__(self):
         """
         Initializes the player, the renderer, and the memory buffer for the screen.
         """
-        # Instance of our drawing engine (from avatar_drawer.py)
-        self.avatar_renderer = AvatarDrawer()
-        
         # Pre-allocate a black blank image (HD Resolution: 1280x720)
         # We use uint8 because images are 8-bit (0-255) integers.
         self.display_canvas = np.zeros((720, 1280, 3), dtype=np.uint8)
+        
+        # The area (x_start, y_start, x_end, y_end) painted by the last frame, None while the canvas is blank
+        self.dirty_region = None
+        
+        # Instance of our drawing engine (from avatar_drawer.py), sized to match the canvas
+        canvas_height, canvas_width, _ = self.display_canvas.shape
+        self.avatar_renderer = AvatarDrawer(canvas_width, canvas_height)
+        
+        # Playback speed of the recorded frames (30 FPS = one frame every ~33ms)
+        self.PLAYBACK_FPS = 30
 
     def calculate_smooth_frame(self, start_frame: dict, end_frame: dict, interpolation_factor: float) -> dict:
         """
@@ -36,97 +102,299 @@ class SignLanguagePlayer:
         :param start_frame: The data of the starting pose (dict).
         :param end_frame: The data of the target pose (dict).
         :param interpolation_factor: A float between 0.0 and 1.0 (0% to 100% progress).
-        :return: A new dictionary containing the calculated coordinates.
+        :return: A new dictionary containing the calculated coordinates as (N, 3) NumPy arrays.
         """
         interpolated_result = {}
         
         # Loop through all body parts: f (Face), p (Pose), l (Left), r (Right)
-        for key in ["f", "p", "l", "r"]:
+        for key in BODY_PART_KEYS:
             # Get points from both frames (handle cases where a hand might be missing in one)
             points_a = start_frame.get(key, [])
             points_b = end_frame.get(key, [])
             
             # If one frame is missing data, we cannot smooth it, so we just snap to the target.
-            if not points_a or not points_b: 
-                interpolated_result[key] = points_b if points_b else points_a
+            # (If both frames are missing it, the body part is left out of the result.)
+            if len(points_a) == 0 or len(points_b) == 0: 
+                if len(points_a) > 0 or len(points_b) > 0:
+                    interpolated_result[key] = points_b if len(points_b) > 0 else points_a
                 continue
             
-            # The Math: Iterate through every point (x, y, z) and calculate the weighted average.
-            # zip(points_a, points_b) pairs the points together (Point 1 with Point 1, etc.)
-            smoothed_points = []
-            for point_a, point_b in zip(points_a, points_b):
-                # Apply Lerp formula to X, Y, and Z
-                new_coords = [
-                    point_a[i] + (point_b[i] - point_a[i]) * interpolation_factor 
-                    for i in range(3)
-                ]
-                smoothed_points.append(new_coords)
-                
-            interpolated_result[key] = smoothed_points
+            # The Math: Turn both point lists into (N, 3) NumPy arrays (a no-op if they already are)
+            # and apply the Lerp formula to every X, Y and Z at once instead of point by point.
+            # The result stays a NumPy array, which the AvatarDrawer accepts directly.
+            array_a = np.ascontiguousarray(points_a, dtype=np.float32)
+            array_b = np.ascontiguousarray(points_b, dtype=np.float32)
+            factors = np.array([interpolation_factor], dtype=np.float32)
+            interpolated_result[key] = lerp_points(array_a, array_b, factors)[0]
             
         return interpolated_result
 
-    def play_sentence(self, words_list: list) -> None:
+    def calculate_smooth_batch(self, start_frame: dict, end_frame: dict, num_steps: int = 10) -> dict:
         """
-        Iterates through a list of words, loads their files, and plays them in sequence.
+        Calculates ALL the "in-between" frames of a transition at once (instead of calling
+        calculate_smooth_frame once per step). The factors are 1/num_steps, 2/num_steps, ... 1.0.
 
-        :param words_list: A list of strings representing filenames (e.g., ["hello", "thank_you"]).
+        :param start_frame: The data of the starting pose (dict).
+        :param end_frame: The data of the target pose (dict).
+        :param num_steps: How many in-between frames to generate.
+        :return: A dictionary containing a (num_steps, N, 3) array for each body part.
         """
-        last_frame_data = None
+        interpolation_factors = np.arange(1, num_steps + 1, dtype=np.float32) / np.float32(num_steps)
         
-        for word in words_list:
-            file_path = f"assets/{word}.json"
+        interpolated_batch = {}
+        for key in BODY_PART_KEYS:
+            points_a = start_frame.get(key, [])
+            points_b = end_frame.get(key, [])
             
-            # Error Handling: Skip words that haven't been processed by the builder yet
-            if not os.path.exists(file_path):
-                print(f"[ERROR] File not found: {file_path}. Skipping.")
+            # Same rule as calculate_smooth_frame: snap to whichever frame has the body part
+            if len(points_a) == 0 or len(points_b) == 0: 
+                if len(points_a) > 0 or len(points_b) > 0:
+                    snapped_points = np.asarray(points_b if len(points_b) > 0 else points_a, dtype=np.float32)
+                    interpolated_batch[key] = np.broadcast_to(snapped_points, (num_steps,) + snapped_points.shape)
                 continue
-
-            # Load the JSON data
-            with open(file_path, 'r') as f:
-                animation_sequence = json.load(f)
             
-            # --- PHASE 1: TRANSITION (The Bridge) ---
-            # If we just finished a word, we need to smooth the jump to the new word.
-            # We generate 10 artificial frames to blend the end of Word A to the start of Word B.
-            if last_frame_data is not None:
-                first_frame_of_new_word = animation_sequence[0]
-                for i in range(1, 11):
-                    # i / 10 gives us steps: 0.1, 0.2, ... 1.0
-                    blend_frame = self.calculate_smooth_frame(
-                        last_frame_data, first_frame_of_new_word, i / 10
-                    )
-                    self.render_to_screen(blend_frame, f"Transitioning...")
-
-            # --- PHASE 2: PLAYBACK ---
-            # Play the actual frames of the current word
-            for frame_data in animation_sequence:
-                self.render_to_screen(frame_data, f"Signing: {word.upper()}")
-                last_frame_data = frame_data # Save this frame to start the next transition
+            # The Math: one call computes every step of the transition
+            array_a = np.ascontiguousarray(points_a, dtype=np.float32)
+            array_b = np.ascontiguousarray(points_b, dtype=np.float32)
+            interpolated_batch[key] = lerp_points(array_a, array_b, interpolation_factors)
+        
+        return interpolated_batch
+
+    def load_animation(self, file_path: str) -> dict:
+        """
+        Loads a word as stacked NumPy arrays, preferring the binary ".npz" cache over the JSON.
+
+        :param file_path: The path of the word's JSON file (e.g., "assets/hello.json").
+        :return: The animation in the layout of animation_data.sequence_to_arrays(),
+                 plus the screen pixels of every frame under the keys "f_px", "p_px", ...
+                 (Shared with the cache: the arrays must not be modified.)
+        """
+        canvas_height, canvas_width, _ = self.display_canvas.shape
+        cache_key = (file_path, canvas_width, canvas_height)
+        
+        # Already loaded? Move it to the end of the cache (= most recently used) and reuse it
+        if cache_key in _cache:
+            animation_arrays = _cache.pop(cache_key)
+            _cache[cache_key] = animation_arrays
+            return animation_arrays
+        
+        # Fast path: the cache already holds the arrays, so there is no text to parse
+        if is_cache_fresh(file_path):
+            animation_arrays = load_arrays(get_cache_path(file_path))
+        else:
+            animation_arrays = self.load_json_animation(file_path)
+        
+        # Convert the whole word to screen pixels once, so drawing a frame needs no math at all.
+        # (The normalized floats are kept as well: the transition Lerp still needs them.)
+        for key in BODY_PART_KEYS:
+            animation_arrays[key + PIXEL_SUFFIX] = self.avatar_renderer.to_pixels(animation_arrays[key])
+        
+        # Remember the word; forget the least recently used one if the cache is full
+        # (a dict keeps insertion order, so its first key is the oldest)
+        if len(_cache) >= _CACHE_MAX_WORDS:
+            del _cache[next(iter(_cache))]
+        _cache[cache_key] = animation_arrays
+        
+        return animation_arrays
+
+    def load_json_animation(self, file_path: str) -> dict:
+        """
+        Parses a word's JSON file and writes the ".npz" cache for the next run.
+
+        :param file_path: The path of the word's JSON file (e.g., "assets/hello.json").
+        :return: The animation in the layout of animation_data.sequence_to_arrays().
+        """
+        # Load the JSON data
+        with open(file_path, 'r') as f:
+            animation_sequence = json.load(f)
+        
+        # Convert the whole word into stacked NumPy arrays once, right after loading,
+        # so the transition Lerp and the drawer reuse ready-made contiguous slices.
+        animation_arrays = sequence_to_arrays(animation_sequence)
+        
+        # Save the cache so the next run can skip the JSON parsing (a failure here is not fatal)
+        try:
+            save_arrays(get_cache_path(file_path), animation_arrays)
+        except OSError as error:
+            print(f"[WARNING] Could not write cache for {file_path}: {error}")
+        
+        return animation_arrays
+
+    def queue_frame(self, frame_queue: queue.Queue, stop_event: threading.Event, item) -> bool:
+        """
+        Hands one item to the render loop, waiting while the queue is full.
+
+        :param frame_queue: The bounded queue read by play_sentence().
+        :param stop_event: Set by the render loop when the user quits.
+        :param item: A (frame_pixels, ui_label, is_playback_frame) tuple, or None for "no more frames".
+        :return: False if playback was stopped and the producer should give up.
+        """
+        while not stop_event.is_set():
+            try:
+                # Short timeout, so a user quitting while the queue is full is noticed quickly
+                frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce_frames(self, words_list: list, frame_queue: queue.Queue, stop_event: threading.Event,
+                       producer_errors: list) -> None:
+        """
+        The compute side of the player (runs in its own thread): loads the words, blends the
+        transitions and queues every frame, ready to draw, for the render loop.
+
+        :param words_list: A list of strings representing filenames (e.g., ["hello", "thank_you"]).
+        :param frame_queue: The bounded queue read by play_sentence().
+        :param stop_event: Set by the render loop when the user quits.
+        :param producer_errors: Receives the exception if loading or blending fails
+                                (re-raised by play_sentence, so errors are never silently swallowed).
+        """
+        last_frame_data = None
+        
+        try:
+            for word in words_list:
+                file_path = f"assets/{word}.json"
+                
+                # Error Handling: Skip words that haven't been processed by the builder yet
+                if not os.path.exists(file_path) and not os.path.exists(get_cache_path(file_path)):
+                    print(f"[ERROR] File not found: {file_path}. Skipping.")
+                    continue
+
+                animation_arrays = self.load_animation(file_path)
+                
+                # A word whose video was missing or unreadable was saved without any frames
+                if count_frames(animation_arrays) == 0:
+                    print(f"[ERROR] No frames in: {file_path}. Skipping.")
+                    continue
+                
+                # --- PHASE 1: TRANSITION (The Bridge) ---
+                # If we just finished a word, we need to smooth the jump to the new word.
+                # We generate 10 artificial frames to blend the end of Word A to the start of Word B.
+                if last_frame_data is not None:
+                    first_frame_of_new_word = get_frame(animation_arrays, 0)
+                    
+                    # All 10 steps (0.1, 0.2, ... 1.0) are calculated and scaled to pixels in one go
+                    blend_batch = self.calculate_smooth_batch(last_frame_data, first_frame_of_new_word, 10)
+                    blend_batch_pixels = {key: self.avatar_renderer.to_pixels(points) for key, points in blend_batch.items()}
+                    
+                    for step in range(10):
+                        blend_pixels = {key: pixels[step] for key, pixels in blend_batch_pixels.items()}
+                        if not self.queue_frame(frame_queue, stop_event, (blend_pixels, "Transitioning...", False)):
+                            return
+
+                # --- PHASE 2: PLAYBACK ---
+                # Play the actual frames of the current word (already converted to pixels at load time)
+                for frame_index in range(count_frames(animation_arrays)):
+                    frame_pixels = get_frame(animation_arrays, frame_index, PIXEL_SUFFIX)
+                    if not self.queue_frame(frame_queue, stop_event, (frame_pixels, f"Signing: {word.upper()}", True)):
+                        return
+                
+                # Save the last frame (normalized coordinates) to start the next transition
+                last_frame_data = get_frame(animation_arrays, -1)
+        except BaseException as error:
+            producer_errors.append(error)
+        finally:
+            # Always tell the render loop that we are done (even after an error), so it never waits forever
+            self.queue_frame(frame_queue, stop_event, None)
+
+    def play_sentence(self, words_list: list) -> None:
+        """
+        Iterates through a list of words, loads their files, and plays them in sequence.
+
+        Computing and displaying run in parallel: a producer thread (produce_frames) prepares the
+        frames while this thread only draws, shows them and handles the keyboard.
+        The queue between them holds just 2 frames, so the producer stays only slightly ahead.
+
+        :param words_list: A list of strings representing filenames (e.g., ["hello", "thank_you"]).
+        """
+        frame_queue = queue.Queue(maxsize=2)
+        stop_event = threading.Event()
+        producer_errors = []
+        producer_thread = threading.Thread(
+            target=self.produce_frames, args=(words_list, frame_queue, stop_event, producer_errors), daemon=True
+        )
+        producer_thread.start()
+        
+        # Frame pacing: every playback frame gets a fixed deadline on a monotonic clock.
+        # cv2.waitKey(33) alone waits "at least" 33ms on top of the drawing time, so the speed drifts;
+        # waiting only for the time left until the deadline keeps a steady frame rate.
+        frame_interval = 1.0 / self.PLAYBACK_FPS
+        next_frame_time = time.monotonic()
+        
+        try:
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break # All words were played
+                
+                frame_pixels, ui_label, is_playback_frame = item
+                self.render_to_screen(frame_pixels, ui_label)
+                
+                if not is_playback_frame:
+                    continue # Transition frames are shown as fast as they come
+                
+                next_frame_time += frame_interval
+                remaining_time = next_frame_time - time.monotonic()
+                if remaining_time < -frame_interval:
+                    # More than a frame late (e.g. a slow first load): restart the clock instead of rushing
+                    next_frame_time = time.monotonic()
+                    remaining_time = 0
                 
                 # Check for 'q' key to quit immediately
-                if cv2.waitKey(33) & 0xFF == ord('q'): 
-                    return
+                # (OpenCV windows must be handled by this thread, so the keyboard is read here)
+                if cv2.waitKey(max(1, int(remaining_time * 1000))) & 0xFF == ord('q'): 
+                    break
+        finally:
+            # Stop the producer (it may be waiting for space in the queue) before leaving
+            stop_event.set()
+            producer_thread.join()
+        
+        # An error in the producer (e.g. a broken JSON file) is raised here, in the caller's thread
+        if producer_errors:
+            raise producer_errors[0]
 
-    def render_to_screen(self, frame_data: dict, ui_label: str) -> None:
+    def clip_region(self, region: tuple) -> tuple:
+        """
+        :param region: A bounding box (x_start, y_start, x_end, y_end), possibly partly outside the canvas.
+        :return: The same box limited to the canvas.
+        """
+        canvas_height, canvas_width, _ = self.display_canvas.shape
+        x_start, y_start, x_end, y_end = region
+        return (max(x_start, 0), max(y_start, 0), min(x_end, canvas_width), min(y_end, canvas_height))
+
+    def render_to_screen(self, frame_pixels: dict, ui_label: str) -> None:
         """
         Updates the canvas with the new frame and displays it.
 
-        :param frame_data: The dictionary of coordinates to draw.
+        :param frame_pixels: The dictionary of pixel positions to draw (see AvatarDrawer.to_pixels).
         :param ui_label: Text string to display on top of the screen (GUI).
         """
-        # 1. Clear the screen (fill with black) to remove the previous frame
-        self.display_canvas.fill(0)
+        # 1. Clear the previous frame (fill with black).
+        # Only the area that was painted last time needs erasing: the dots and the label cover
+        # a small part of the 1280x720 screen, so this writes far less memory than clearing everything.
+        if self.dirty_region is not None:
+            x_start, y_start, x_end, y_end = self.dirty_region
+            self.display_canvas[y_start:y_end, x_start:x_end] = 0
         
         # 2. Ask the Renderer (AvatarDrawer) to draw the dots
-        self.avatar_renderer.draw_frame(self.display_canvas, frame_data)
+        dots_region = self.avatar_renderer.draw_frame(self.display_canvas, frame_pixels)
         
         # 3. Add the text label (Green text)
+        label_origin = (50, 50)
         cv2.putText(
-            self.display_canvas, ui_label, (50, 50), 
+            self.display_canvas, ui_label, label_origin, 
             cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2
         )
         
+        # Remember what was painted, so the next frame can erase exactly that
+        (label_width, label_height), label_baseline = cv2.getTextSize(ui_label, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+        label_region = self.clip_region((
+            label_origin[0] - 2, label_origin[1] - label_height - 2,
+            label_origin[0] + label_width + 2, label_origin[1] + label_baseline + 2
+        )) # +2 pixels on each side for the thickness of the text strokes
+        self.dirty_region = merge_boxes(label_region, dots_region)
+        
         # 4. Refresh the window
         cv2.imshow("Signify - Final Player", self.display_canvas)
         